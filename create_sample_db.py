@@ -5,159 +5,414 @@ This creates a realistic sample database with multiple tables and relationships
 """
 
 import sqlite3
-import os
+import hashlib
+from pathlib import Path
+import random
+from datetime import datetime, timezone
+from itertools import chain, islice
 
-def create_sample_database():
-    """Create a sample database with realistic schema"""
-    
-    db_path = "sample_data.db"
-    
-    # Remove existing database
-    if os.path.exists(db_path):
-        os.remove(db_path)
+# apsw binds straight to the SQLite C API; fall back to the stdlib module
+try:
+    import apsw
+except ImportError:
+    apsw = None
+
+SCHEMA_SQL = '''
+    CREATE TABLE customers (
+        customer_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        first_name TEXT NOT NULL,
+        last_name TEXT NOT NULL,
+        email TEXT NOT NULL,
+        phone TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+
+    CREATE TABLE products (
+        product_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        product_name TEXT NOT NULL,
+        description TEXT,
+        category TEXT,
+        price REAL NOT NULL,
+        stock_quantity INTEGER DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+
+    CREATE TABLE addresses (
+        address_id INTEGER PRIMARY KEY,
+        address TEXT NOT NULL
+    );
+
+    CREATE TABLE orders (
+        order_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        customer_id INTEGER NOT NULL,
+        order_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        total_amount REAL NOT NULL,
+        status TEXT,
+        shipping_address_id INTEGER,
+        FOREIGN KEY (customer_id) REFERENCES customers(customer_id),
+        FOREIGN KEY (shipping_address_id) REFERENCES addresses(address_id)
+    );
+
+    CREATE TABLE order_items (
+        order_id INTEGER NOT NULL,
+        product_id INTEGER NOT NULL,
+        quantity INTEGER NOT NULL,
+        unit_price REAL NOT NULL,
+        subtotal REAL GENERATED ALWAYS AS (quantity * unit_price) VIRTUAL,
+        PRIMARY KEY (order_id, product_id),
+        FOREIGN KEY (order_id) REFERENCES orders(order_id),
+        FOREIGN KEY (product_id) REFERENCES products(product_id)
+    ) WITHOUT ROWID;
+
+    CREATE TABLE reviews (
+        review_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        product_id INTEGER NOT NULL,
+        customer_id INTEGER NOT NULL,
+        rating INTEGER,
+        review_text TEXT,
+        review_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (product_id) REFERENCES products(product_id),
+        FOREIGN KEY (customer_id) REFERENCES customers(customer_id)
+    );
+'''
+
+# Indexes are built after the seed data is loaded so inserts don't pay for
+# per-row B-tree maintenance; the email uniqueness constraint lives here too.
+# order_items needs no index of its own: its primary key leads with order_id.
+INDEX_SQL = (
+    'CREATE UNIQUE INDEX idx_customer_email ON customers(email)',
+    'CREATE UNIQUE INDEX idx_address ON addresses(address)',
+    'CREATE INDEX idx_order_customer ON orders(customer_id)',
+    'CREATE INDEX idx_reviews_product ON reviews(product_id)',
+)
+
+# Seed data: the column list and rows for each table. A trailing timestamp
+# column is bound once at build time rather than left to its DEFAULT.
+CUSTOMERS_COLUMNS = ('first_name', 'last_name', 'email', 'phone', 'created_at')
+
+CUSTOMERS = (
+    ('John', 'Doe', 'john.doe@email.com', '555-0101'),
+    ('Jane', 'Smith', 'jane.smith@email.com', '555-0102'),
+    ('Bob', 'Johnson', 'bob.johnson@email.com', '555-0103'),
+    ('Alice', 'Williams', 'alice.williams@email.com', '555-0104'),
+    ('Charlie', 'Brown', 'charlie.brown@email.com', '555-0105'),
+)
+
+PRODUCTS_COLUMNS = ('product_name', 'description', 'category', 'price', 'stock_quantity',
+                    'created_at')
+
+PRODUCTS = (
+    ('Laptop Pro 15', 'High-performance laptop', 'Electronics', 1299.99, 50),
+    ('Wireless Mouse', 'Ergonomic wireless mouse', 'Electronics', 29.99, 200),
+    ('USB-C Cable', 'Fast charging cable', 'Accessories', 19.99, 500),
+    ('Laptop Bag', 'Durable laptop carrying bag', 'Accessories', 49.99, 100),
+    ('External SSD 1TB', 'Portable storage device', 'Electronics', 149.99, 75),
+)
+
+ADDRESSES_COLUMNS = ('address',)
+
+ADDRESSES = (
+    ('123 Main St, City, State 12345',),
+    ('456 Oak Ave, Town, State 67890',),
+    ('789 Pine Rd, Village, State 11111',),
+    ('321 Elm St, Borough, State 22222',),
+)
+
+# Orders reference their shipping address by id (position in ADDRESSES)
+ORDERS_COLUMNS = ('customer_id', 'total_amount', 'status', 'shipping_address_id',
+                  'order_date')
+
+ORDERS = (
+    (1, 1329.98, 'delivered', 1),
+    (2, 199.98, 'shipped', 2),
+    (3, 49.99, 'processing', 3),
+    (1, 29.99, 'delivered', 1),
+    (4, 1499.97, 'pending', 4),
+)
+
+# subtotal is a generated column and is never inserted
+ORDER_ITEMS_COLUMNS = ('order_id', 'product_id', 'quantity', 'unit_price')
+
+ORDER_ITEMS = (
+    (1, 1, 1, 1299.99),
+    (1, 3, 1, 19.99),
+    (2, 5, 1, 149.99),
+    (2, 4, 1, 49.99),
+    (3, 4, 1, 49.99),
+    (4, 2, 1, 29.99),
+    (5, 1, 1, 1299.99),
+    (5, 2, 2, 29.99),
+    (5, 5, 1, 149.99),
+)
+
+REVIEWS_COLUMNS = ('product_id', 'customer_id', 'rating', 'review_text', 'review_date')
+
+REVIEWS = (
+    (1, 1, 5, 'Excellent laptop, very fast!'),
+    (1, 3, 4, 'Great performance, slightly heavy'),
+    (2, 1, 5, 'Perfect mouse, very comfortable'),
+    (5, 2, 5, 'Super fast storage device'),
+    (4, 3, 4, 'Good quality bag, fits my laptop perfectly'),
+)
+
+# Valid order statuses. The schema has no CHECK constraints on status or
+# rating: seed rows are trusted, and the generators only emit valid values.
+ORDER_STATUSES = ('pending', 'processing', 'shipped', 'delivered', 'cancelled')
+
+# Bump whenever the row generators or the build steps change what gets
+# written, so existing sample databases are rebuilt
+GENERATOR_REVISION = 1
+
+# SQLite's default cap on bound parameters per statement (SQLITE_MAX_VARIABLE_NUMBER)
+MAX_SQL_PARAMS = 999
+
+# Orders generated per pass; each pass emits its orders and their items
+ORDER_CHUNK = 1000
+
+def _insert_rows(cursor, table, columns, rows):
+    """Insert rows using multi-row INSERT ... VALUES statements
     
-    # Create connection
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+    `rows` may be any iterable; it is consumed one batch at a time, so
+    generated rows are never materialized all at once.
+    """
+    group = f"({', '.join('?' * len(columns))})"
+    prefix = f"INSERT INTO {table} ({', '.join(columns)}) VALUES "
+    batch_size = MAX_SQL_PARAMS // len(columns)
+    # Every full batch shares one statement text, so it is prepared once
+    full_batch_sql = prefix + ', '.join([group] * batch_size)
+    rows = iter(rows)
     
-    # Create Customers table
-    cursor.execute('''
-        CREATE TABLE customers (
-            customer_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            first_name TEXT NOT NULL,
-            last_name TEXT NOT NULL,
-            email TEXT UNIQUE NOT NULL,
-            phone TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
+    while True:
+        batch = tuple(islice(rows, batch_size))
+        if not batch:
+            break
+        if len(batch) == batch_size:
+            sql = full_batch_sql
+        else:
+            sql = prefix + ', '.join([group] * len(batch))
+        cursor.execute(sql, tuple(chain.from_iterable(batch)))
+
+def _row_rng(seed, kind, row_id):
+    """Deterministic RNG for one generated row, so it can be rebuilt on demand"""
+    return random.Random(f"{seed}:{kind}:{row_id}")
+
+def _customer_row(customer_id, seed):
+    """Curated customer row, or a generated one past the end of CUSTOMERS"""
+    if customer_id <= len(CUSTOMERS):
+        return CUSTOMERS[customer_id - 1]
+    rng = _row_rng(seed, 'customer', customer_id)
+    first_name = rng.choice(CUSTOMERS)[0]
+    last_name = rng.choice(CUSTOMERS)[1]
+    email = f"{first_name}.{last_name}.{customer_id}@email.com".lower()
+    return (first_name, last_name, email, f"555-{customer_id % 10000:04d}")
+
+def _product_row(product_id, seed):
+    """Curated product row, or a generated one past the end of PRODUCTS"""
+    if product_id <= len(PRODUCTS):
+        return PRODUCTS[product_id - 1]
+    rng = _row_rng(seed, 'product', product_id)
+    name, description, category, _, _ = rng.choice(PRODUCTS)
+    return (f"{name} #{product_id}", description, category,
+            round(rng.uniform(5, 1500), 2), rng.randint(0, 500))
+
+def _order(order_id, n_customers, prices, seed):
+    """Return (order row, item rows) for an order
     
-    # Create Products table
-    cursor.execute('''
-        CREATE TABLE products (
-            product_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            product_name TEXT NOT NULL,
-            description TEXT,
-            category TEXT,
-            price REAL NOT NULL,
-            stock_quantity INTEGER DEFAULT 0,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
+    Curated orders are used while their customer and products exist;
+    otherwise a random order is generated over the available ids.
+    `prices` holds the unit price of every product, in product_id order.
+    """
+    n_products = len(prices)
+    if order_id <= len(ORDERS):
+        order = ORDERS[order_id - 1]
+        items = [item[1:] for item in ORDER_ITEMS if item[0] == order_id]
+        if order[0] <= n_customers and all(item[0] <= n_products for item in items):
+            return order, items
     
-    # Create Orders table
-    cursor.execute('''
-        CREATE TABLE orders (
-            order_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            customer_id INTEGER NOT NULL,
-            order_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            total_amount REAL NOT NULL,
-            status TEXT CHECK(status IN ('pending', 'processing', 'shipped', 'delivered', 'cancelled')),
-            shipping_address TEXT,
-            FOREIGN KEY (customer_id) REFERENCES customers(customer_id)
-        )
-    ''')
+    rng = _row_rng(seed, 'order', order_id)
+    product_ids = rng.sample(range(1, n_products + 1), min(n_products, rng.randint(1, 3)))
+    items = []
+    for product_id in product_ids:
+        quantity = rng.randint(1, 3)
+        unit_price = prices[product_id - 1]
+        items.append((product_id, quantity, unit_price))
+    order = (
+        rng.randint(1, n_customers),
+        round(sum(quantity * unit_price for _, quantity, unit_price in items), 2),
+        rng.choice(ORDER_STATUSES),
+        rng.randint(1, len(ADDRESSES)),
+    )
+    return order, items
+
+def _review_row(review_id, n_customers, n_products, seed):
+    """Curated review row when its references exist, else a generated one"""
+    if review_id <= len(REVIEWS):
+        review = REVIEWS[review_id - 1]
+        if review[0] <= n_products and review[1] <= n_customers:
+            return review
+    rng = _row_rng(seed, 'review', review_id)
+    return (rng.randint(1, n_products), rng.randint(1, n_customers),
+            rng.randint(1, 5), rng.choice(REVIEWS)[3])
+
+def _seed_data(n_customers, n_products, n_orders, n_reviews, seed, timestamp):
+    """Yield (table, columns, rows) for the seed data
     
-    # Create Order Items table
-    cursor.execute('''
-        CREATE TABLE order_items (
-            order_item_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            order_id INTEGER NOT NULL,
-            product_id INTEGER NOT NULL,
-            quantity INTEGER NOT NULL,
-            unit_price REAL NOT NULL,
-            subtotal REAL NOT NULL,
-            FOREIGN KEY (order_id) REFERENCES orders(order_id),
-            FOREIGN KEY (product_id) REFERENCES products(product_id)
-        )
-    ''')
+    Rows start with the curated literals above and are topped up with
+    generated rows to reach the requested counts. `timestamp` fills the
+    created/order/review date columns.
+    """
+    yield 'customers', CUSTOMERS_COLUMNS, (
+        _customer_row(i, seed) + (timestamp,) for i in range(1, n_customers + 1)
+    )
+    yield 'products', PRODUCTS_COLUMNS, (
+        _product_row(i, seed) + (timestamp,) for i in range(1, n_products + 1)
+    )
+    yield 'addresses', ADDRESSES_COLUMNS, ADDRESSES
     
-    # Create Reviews table
-    cursor.execute('''
-        CREATE TABLE reviews (
-            review_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            product_id INTEGER NOT NULL,
-            customer_id INTEGER NOT NULL,
-            rating INTEGER CHECK(rating BETWEEN 1 AND 5),
-            review_text TEXT,
-            review_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (product_id) REFERENCES products(product_id),
-            FOREIGN KEY (customer_id) REFERENCES customers(customer_id)
-        )
-    ''')
+    # Each order is built once; its row and items are emitted chunk by chunk
+    prices = [_product_row(i, seed)[3] for i in range(1, n_products + 1)] if n_orders else []
+    for start in range(1, n_orders + 1, ORDER_CHUNK):
+        orders = []
+        items = []
+        for i in range(start, min(start + ORDER_CHUNK, n_orders + 1)):
+            order, order_items = _order(i, n_customers, prices, seed)
+            orders.append(order + (timestamp,))
+            items.extend((i,) + item for item in order_items)
+        yield 'orders', ORDERS_COLUMNS, orders
+        yield 'order_items', ORDER_ITEMS_COLUMNS, items
     
-    # Insert sample data
-    cursor.executemany('''
-        INSERT INTO customers (first_name, last_name, email, phone)
-        VALUES (?, ?, ?, ?)
-    ''', [
-        ('John', 'Doe', 'john.doe@email.com', '555-0101'),
-        ('Jane', 'Smith', 'jane.smith@email.com', '555-0102'),
-        ('Bob', 'Johnson', 'bob.johnson@email.com', '555-0103'),
-        ('Alice', 'Williams', 'alice.williams@email.com', '555-0104'),
-        ('Charlie', 'Brown', 'charlie.brown@email.com', '555-0105')
-    ])
+    yield 'reviews', REVIEWS_COLUMNS, (
+        _review_row(i, n_customers, n_products, seed) + (timestamp,)
+        for i in range(1, n_reviews + 1)
+    )
+
+def _connect_memory():
+    """Open the in-memory build database in autocommit mode"""
+    if apsw is not None:
+        return apsw.Connection(":memory:", statementcachesize=256)
+    return sqlite3.connect(":memory:", isolation_level=None, cached_statements=256)
+
+def _connect_disk(db_path):
+    """Open the on-disk target database"""
+    if apsw is not None:
+        return apsw.Connection(db_path)
+    return sqlite3.connect(db_path, isolation_level=None)
+
+def _backup(source, dest):
+    """Copy every page of the source database into dest in a single step"""
+    if apsw is not None:
+        with dest.backup("main", source, "main") as backup:
+            backup.step()
+    else:
+        source.backup(dest)
+
+def _execute_script(conn, script):
+    """Run several SQL statements in one call"""
+    if apsw is not None:
+        conn.execute(script)
+    else:
+        conn.executescript(script)
+
+def _build_version(*params):
+    """Fingerprint of the build inputs and parameters, for PRAGMA user_version
     
-    cursor.executemany('''
-        INSERT INTO products (product_name, description, category, price, stock_quantity)
-        VALUES (?, ?, ?, ?, ?)
-    ''', [
-        ('Laptop Pro 15', 'High-performance laptop', 'Electronics', 1299.99, 50),
-        ('Wireless Mouse', 'Ergonomic wireless mouse', 'Electronics', 29.99, 200),
-        ('USB-C Cable', 'Fast charging cable', 'Accessories', 19.99, 500),
-        ('Laptop Bag', 'Durable laptop carrying bag', 'Accessories', 49.99, 100),
-        ('External SSD 1TB', 'Portable storage device', 'Electronics', 149.99, 75)
-    ])
+    Covers the schema, indexes, seed rows and GENERATOR_REVISION, so edits
+    elsewhere in this script leave the shipped database current; the result
+    is masked to a positive 32-bit integer.
+    """
+    inputs = (SCHEMA_SQL, INDEX_SQL,
+              CUSTOMERS_COLUMNS, CUSTOMERS, PRODUCTS_COLUMNS, PRODUCTS,
+              ADDRESSES_COLUMNS, ADDRESSES, ORDERS_COLUMNS, ORDERS,
+              ORDER_ITEMS_COLUMNS, ORDER_ITEMS, REVIEWS_COLUMNS, REVIEWS,
+              ORDER_STATUSES, GENERATOR_REVISION, params)
+    digest = hashlib.sha256(repr(inputs).encode())
+    return int(digest.hexdigest()[:8], 16) & 0x7FFFFFFF
+
+def _is_up_to_date(db_path, version):
+    """Check whether db_path was already built with the given version"""
+    if not Path(db_path).exists():
+        return False
+    try:
+        conn = sqlite3.connect(Path(db_path).resolve().as_uri() + "?mode=ro", uri=True)
+        try:
+            return conn.execute("PRAGMA user_version").fetchone()[0] == version
+        finally:
+            conn.close()
+    except sqlite3.DatabaseError:
+        return False
+
+def create_sample_database(db_path="sample_data.db", n_customers=5, n_products=5,
+                           n_orders=5, n_reviews=5, seed=0):
+    """Create a sample database with realistic schema
     
-    cursor.executemany('''
-        INSERT INTO orders (customer_id, total_amount, status, shipping_address)
-        VALUES (?, ?, ?, ?)
-    ''', [
-        (1, 1329.98, 'delivered', '123 Main St, City, State 12345'),
-        (2, 199.98, 'shipped', '456 Oak Ave, Town, State 67890'),
-        (3, 49.99, 'processing', '789 Pine Rd, Village, State 11111'),
-        (1, 29.99, 'delivered', '123 Main St, City, State 12345'),
-        (4, 1499.97, 'pending', '321 Elm St, Borough, State 22222')
-    ])
+    The row counts default to the curated sample data; larger counts add
+    generated rows (reproducible for a given `seed`) to build bigger fixtures.
+    An existing database built by the same script version and parameters is
+    left untouched.
+    """
     
-    cursor.executemany('''
-        INSERT INTO order_items (order_id, product_id, quantity, unit_price, subtotal)
-        VALUES (?, ?, ?, ?, ?)
-    ''', [
-        (1, 1, 1, 1299.99, 1299.99),
-        (1, 3, 1, 19.99, 19.99),
-        (2, 5, 1, 149.99, 149.99),
-        (2, 4, 1, 49.99, 49.99),
-        (3, 4, 1, 49.99, 49.99),
-        (4, 2, 1, 29.99, 29.99),
-        (5, 1, 1, 1299.99, 1299.99),
-        (5, 2, 2, 29.99, 59.98),
-        (5, 5, 1, 149.99, 149.99)
-    ])
+    # Validate before touching any existing file
+    if min(n_customers, n_products, n_orders, n_reviews) < 0:
+        raise ValueError("row counts must not be negative")
+    if (n_orders or n_reviews) and not (n_customers and n_products):
+        raise ValueError("orders and reviews need at least one customer and product")
     
-    cursor.executemany('''
-        INSERT INTO reviews (product_id, customer_id, rating, review_text)
-        VALUES (?, ?, ?, ?)
-    ''', [
-        (1, 1, 5, 'Excellent laptop, very fast!'),
-        (1, 3, 4, 'Great performance, slightly heavy'),
-        (2, 1, 5, 'Perfect mouse, very comfortable'),
-        (5, 2, 5, 'Super fast storage device'),
-        (4, 3, 4, 'Good quality bag, fits my laptop perfectly')
-    ])
+    version = _build_version(n_customers, n_products, n_orders, n_reviews, seed)
+    if _is_up_to_date(db_path, version):
+        print(f"✓ Sample database is up to date: {db_path}")
+        return
     
-    # Create indexes for performance
-    cursor.execute('CREATE INDEX idx_customer_email ON customers(email)')
-    cursor.execute('CREATE INDEX idx_order_customer ON orders(customer_id)')
-    cursor.execute('CREATE INDEX idx_order_items_order ON order_items(order_id)')
-    cursor.execute('CREATE INDEX idx_reviews_product ON reviews(product_id)')
+    # Remove existing database
+    Path(db_path).unlink(missing_ok=True)
     
-    conn.commit()
-    conn.close()
+    # Build in memory and write the finished file in one pass at the end
+    # (autocommit mode: transactions are managed explicitly)
+    conn = _connect_memory()
+    try:
+        cursor = conn.cursor()
+
+        # Larger pages mean fewer B-tree pages; the backup copies the page size
+        cursor.execute("PRAGMA page_size=8192")
+
+        # Build schema and seed data in a single transaction (one commit).
+        # BEGIN lives inside the script because sqlite3's executescript()
+        # commits any transaction that is already open before running.
+        _execute_script(conn, "BEGIN;" + SCHEMA_SQL)
+        
+        # Insert sample data (multi-row INSERTs, rows generated on the fly),
+        # stamped with one UTC timestamp in CURRENT_TIMESTAMP format
+        timestamp = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+        seed_data = _seed_data(n_customers, n_products, n_orders, n_reviews, seed, timestamp)
+        for table, columns, rows in seed_data:
+            _insert_rows(cursor, table, columns, rows)
+        
+        # Create indexes for performance (executescript() would end the
+        # transaction, so these run as plain statements)
+        for statement in INDEX_SQL:
+            cursor.execute(statement)
+        
+        # Ship planner statistics (sqlite_stat1) with the database
+        cursor.execute("ANALYZE")
+        cursor.execute("PRAGMA optimize")
+        
+        # Stamp the build so unchanged reruns can skip it
+        cursor.execute(f"PRAGMA user_version={version}")
+        
+        cursor.execute("COMMIT")
+        
+        # The backup API copies the finished pages to disk in one sequential
+        # sweep, so there is no incremental file growth to pre-allocate for
+        disk = _connect_disk(db_path)
+        try:
+            disk.execute("PRAGMA synchronous=NORMAL")
+            _backup(conn, disk)
+        finally:
+            disk.close()
+    finally:
+        conn.close()
     
     print(f"✓ Sample database created: {db_path}")
-    print("  Tables: customers, products, orders, order_items, reviews")
+    print("  Tables: customers, products, addresses, orders, order_items, reviews")
     print("  Relationships: Foreign keys established")
     print("  Sample data: Populated with test records")
 
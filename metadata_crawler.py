@@ -10,38 +10,235 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
 import json
 import sqlite3
+import copy
+import time
 from datetime import datetime
+from decimal import Decimal
 import threading
 import queue
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
 import os
 import sys
 
 # Import required libraries
 try:
     import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
     from sqlalchemy import create_engine, inspect, MetaData
+    from sqlalchemy.engine import make_url
+    from sqlalchemy.pool import NullPool
     import pandas as pd
     import networkx as nx
-    from openpyxl import Workbook
+    from openpyxl import Workbook, load_workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.cell.cell import TYPE_ERROR, TYPE_NUMERIC
     from openpyxl.styles import Font, PatternFill, Alignment
+    from openpyxl.utils import get_column_letter
 except ImportError as e:
     print(f"Missing required library: {e}")
     print("Please install: pip install requests sqlalchemy pandas networkx openpyxl --break-system-packages")
     sys.exit(1)
 
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Header styling shared by every exported sheet
+HEADER_FONT = Font(bold=True, color="FFFFFF")
+HEADER_FILL = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+HEADER_ALIGNMENT = Alignment(horizontal="center")
+
+# Display labels for source types in the statistics view
+_SOURCE_LABEL = {"database": "Database", "api": "API", "file": "File", "files": "Files"}
+
+
+def _repr_tokens(value):
+    """Yield repr(value) piece by piece for JSON-style data, without recursion"""
+    if isinstance(value, dict):
+        yield '{'
+        stack = [[iter(value.items()), True, '}', True]]
+    elif isinstance(value, list):
+        yield '['
+        stack = [[iter(value), False, ']', True]]
+    else:
+        yield repr(value)
+        return
+    
+    while stack:
+        frame = stack[-1]
+        items, is_dict, closer, first = frame
+        try:
+            item = next(items)
+        except StopIteration:
+            stack.pop()
+            yield closer
+            continue
+        
+        if not first:
+            yield ', '
+        frame[3] = False
+        if is_dict:
+            key, item = item
+            yield repr(key)
+            yield ': '
+        
+        if isinstance(item, dict):
+            yield '{'
+            stack.append([iter(item.items()), True, '}', True])
+        elif isinstance(item, list):
+            yield '['
+            stack.append([iter(item), False, ']', True])
+        else:
+            yield repr(item)
+
+
+def _sample(value, limit=100):
+    """Return str(value)[:limit] without rendering all of a large container"""
+    if not isinstance(value, (dict, list)):
+        return str(value)[:limit]
+    
+    parts = []
+    length = 0
+    for token in _repr_tokens(value):
+        parts.append(token)
+        length += len(token)
+        if length >= limit:
+            break
+    return ''.join(parts)[:limit]
+
+
+def _excel_value(cell):
+    """Convert an openpyxl cell the way pandas' openpyxl reader does"""
+    if cell.value is None:
+        return ''
+    if cell.data_type == TYPE_ERROR:
+        return float('nan')
+    if cell.data_type == TYPE_NUMERIC:
+        # Whole-number floats read as ints
+        value = int(cell.value)
+        return value if value == cell.value else float(cell.value)
+    return cell.value
+
 
 class MetadataCrawler:
     """Core crawler engine for extracting metadata from multiple sources"""
     
-    def __init__(self):
+    # One row per data dictionary entry. Re-crawled keys are updated in
+    # place, so rowid order is the order entries were first seen.
+    _DICTIONARY_SQL = """
+        CREATE TABLE dictionary (
+            entry_key TEXT PRIMARY KEY,
+            source TEXT,
+            source_type TEXT NOT NULL,
+            table_name TEXT,
+            column_name TEXT,
+            field TEXT,
+            data_type TEXT,
+            nullable INTEGER
+        );
+        CREATE VIEW dictionary_export AS
+            SELECT rowid AS seq, entry_key, source, source_type,
+                   COALESCE(table_name, field, '') AS table_or_field,
+                   COALESCE(column_name, '') AS column_name,
+                   data_type,
+                   CASE WHEN nullable IS NULL THEN ''
+                        WHEN nullable THEN 'True' ELSE 'False' END AS nullable
+            FROM dictionary;
+    """
+    
+    def __init__(self, api_ttl=300, max_schema_fanout=2000):
         self.metadata_repo = []
+        # Keys recorded per JSON object before its schema is truncated
+        # (None records every key)
+        self.max_schema_fanout = max_schema_fanout
         self.lineage_graph = nx.DiGraph()
-        self.data_dictionary = {}
-        
+        # Data dictionary store; shared by crawl threads under self._lock
+        self.db = sqlite3.connect(":memory:", check_same_thread=False)
+        self.db.executescript(self._DICTIONARY_SQL)
+        # Bumped on every dictionary write; generate_data_dictionary reuses
+        # its last result while the version is unchanged
+        self._dictionary_version = 0
+        self._dictionary_cache = (None, None)
+        self._dictionary_size = 0
+        # Inferred API metadata by (url, headers): (fetched_at, metadata,
+        # etag, last_modified). Reused as-is for api_ttl seconds, then
+        # revalidated with a conditional GET.
+        self.api_ttl = api_ttl
+        self._api_cache = {}
+        self.session = requests.Session()
+        # Pooled keep-alive connections avoid a new TCP/TLS handshake per crawl
+        adapter = HTTPAdapter(pool_connections=20, pool_maxsize=50,
+                              max_retries=Retry(total=2, backoff_factor=0.3))
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        # SQLAlchemy engines (and their connection pools) by connection string
+        self._engine_cache = {}
+        # Guards shared state when sources are crawled from several threads
+        self._lock = threading.RLock()
+        
+    def close(self):
+        """Release pooled database and HTTP connections"""
+        with self._lock:
+            engines = list(self._engine_cache.values())
+            self._engine_cache.clear()
+        for engine in engines:
+            engine.dispose()
+        self.session.close()
+        with self._lock:
+            self.db.close()
+        
+    def _get_engine(self, connection_string):
+        """Return a cached engine for the connection string, creating it once
+        
+        File-backed SQLite engines don't pool connections: a pooled
+        connection would keep reading a file that has since been deleted
+        or replaced, and opening a local file again is cheap.
+        """
+        with self._lock:
+            engine = self._engine_cache.get(connection_string)
+            if engine is None:
+                url = make_url(connection_string)
+                if url.get_backend_name() == 'sqlite' and url.database not in (None, '', ':memory:'):
+                    engine = create_engine(connection_string, poolclass=NullPool)
+                else:
+                    engine = create_engine(connection_string, pool_pre_ping=True)
+                self._engine_cache[connection_string] = engine
+            return engine
+        
+    def _add_dictionary_entries(self, rows):
+        """Insert or replace data dictionary rows; caller holds self._lock
+        
+        Rows are (entry_key, source, source_type, table_name, column_name,
+        field, data_type, nullable) tuples.
+        """
+        self._dictionary_version += 1
+        with self.db:
+            self.db.executemany(
+                """INSERT INTO dictionary VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(entry_key) DO UPDATE SET
+                       source = excluded.source,
+                       source_type = excluded.source_type,
+                       table_name = excluded.table_name,
+                       column_name = excluded.column_name,
+                       field = excluded.field,
+                       data_type = excluded.data_type,
+                       nullable = excluded.nullable""",
+                rows
+            )
+        # Entries are never deleted and upserts keep their rowid, so the
+        # largest rowid is the number of distinct keys (an index seek)
+        self._dictionary_size = self.db.execute(
+            "SELECT MAX(rowid) FROM dictionary"
+        ).fetchone()[0] or 0
+    
     def crawl_database(self, connection_string, db_type='sqlite'):
         """Crawl a database and extract schema metadata"""
+        now_iso = datetime.now().isoformat(timespec="seconds")
         try:
-            engine = create_engine(connection_string)
+            engine = self._get_engine(connection_string)
             inspector = inspect(engine)
             
             db_metadata = {
@@ -49,19 +246,31 @@ class MetadataCrawler:
                 'db_type': db_type,
                 'connection': connection_string,
                 'tables': [],
-                'timestamp': datetime.now().isoformat()
+                'timestamp': now_iso
             }
             
+            # Reflect every table in one batch per kind of object (a single
+            # catalog query on dialects that support it) instead of four
+            # round trips per table. Keys are (schema, table) pairs.
+            all_columns = inspector.get_multi_columns()
+            all_pks = inspector.get_multi_pk_constraint()
+            all_fks = inspector.get_multi_foreign_keys()
+            all_indexes = inspector.get_multi_indexes()
+            
+            dictionary_rows = []
+            lineage_nodes = []
+            lineage_edges = []
             for table_name in inspector.get_table_names():
+                key = (None, table_name)
                 table_info = {
                     'name': table_name,
                     'columns': [],
-                    'primary_keys': inspector.get_pk_constraint(table_name),
-                    'foreign_keys': inspector.get_foreign_keys(table_name),
-                    'indexes': inspector.get_indexes(table_name)
+                    'primary_keys': all_pks.get(key, {}),
+                    'foreign_keys': all_fks.get(key, []),
+                    'indexes': all_indexes.get(key, [])
                 }
                 
-                for column in inspector.get_columns(table_name):
+                for column in all_columns.get(key, []):
                     column_info = {
                         'name': column['name'],
                         'type': str(column['type']),
@@ -72,25 +281,27 @@ class MetadataCrawler:
                     table_info['columns'].append(column_info)
                     
                     # Add to data dictionary
-                    dict_key = f"{table_name}.{column['name']}"
-                    self.data_dictionary[dict_key] = {
-                        'table': table_name,
-                        'column': column['name'],
-                        'data_type': str(column['type']),
-                        'nullable': column['nullable'],
-                        'source': connection_string
-                    }
+                    dictionary_rows.append((
+                        f"{table_name}.{column['name']}", connection_string, 'database',
+                        table_name, column['name'], None, column_info['type'],
+                        column['nullable']
+                    ))
                 
                 db_metadata['tables'].append(table_info)
+                lineage_nodes.append((table_name, {'node_type': 'table', 'source': 'database'}))
+                lineage_edges.extend(
+                    (table_name, fk['referred_table'], {'relationship': 'foreign_key'})
+                    for fk in table_info['foreign_keys']
+                )
+            
+            with self._lock:
+                self._add_dictionary_entries(dictionary_rows)
+                self.metadata_repo.append(db_metadata)
                 
                 # Add to lineage graph
-                self.lineage_graph.add_node(table_name, node_type='table', source='database')
-                for fk in table_info['foreign_keys']:
-                    ref_table = fk['referred_table']
-                    self.lineage_graph.add_edge(table_name, ref_table, 
-                                               relationship='foreign_key')
+                self.lineage_graph.add_nodes_from(lineage_nodes)
+                self.lineage_graph.add_edges_from(lineage_edges)
             
-            self.metadata_repo.append(db_metadata)
             return True, f"Successfully crawled {len(db_metadata['tables'])} tables"
             
         except Exception as e:
@@ -98,60 +309,174 @@ class MetadataCrawler:
     
     def crawl_api(self, api_url, headers=None):
         """Crawl an API endpoint and extract metadata"""
+        now_iso = datetime.now().isoformat(timespec="seconds")
         try:
-            response = requests.get(api_url, headers=headers, timeout=30)
-            response.raise_for_status()
+            cache_key = (api_url, tuple(sorted((headers or {}).items())))
+            with self._lock:
+                cached = self._api_cache.get(cache_key)
             
-            data = response.json()
-            
-            api_metadata = {
-                'source_type': 'api',
-                'url': api_url,
-                'timestamp': datetime.now().isoformat(),
-                'status_code': response.status_code,
-                'schema': self._infer_schema(data)
-            }
+            from_cache = bool(cached) and time.monotonic() - cached[0] < self.api_ttl
+            if not from_cache:
+                request_headers = dict(headers or {})
+                if cached:
+                    _, _, etag, last_modified = cached
+                    if etag:
+                        request_headers['If-None-Match'] = etag
+                    if last_modified:
+                        request_headers['If-Modified-Since'] = last_modified
+                
+                response = self.session.get(api_url, headers=request_headers, timeout=30)
+                if cached and response.status_code == 304:
+                    # Unchanged since the last crawl: keep the inferred schema
+                    from_cache = True
+                    cached = (time.monotonic(),) + cached[1:]
+                else:
+                    response.raise_for_status()
+                    
+                    data = response.json()
+                    
+                    cached = (
+                        time.monotonic(),
+                        {
+                            'source_type': 'api',
+                            'url': api_url,
+                            'timestamp': now_iso,
+                            'status_code': response.status_code,
+                            'schema': self._infer_schema(data)
+                        },
+                        response.headers.get('ETag'),
+                        response.headers.get('Last-Modified')
+                    )
+                with self._lock:
+                    self._api_cache[cache_key] = cached
             
-            self.metadata_repo.append(api_metadata)
+            api_metadata = copy.deepcopy(cached[1])
+            api_metadata['timestamp'] = now_iso
             
-            # Add to lineage graph
+            # Add to repository and lineage graph
             endpoint_name = api_url.split('/')[-1] or 'root'
-            self.lineage_graph.add_node(endpoint_name, node_type='api', source=api_url)
+            with self._lock:
+                self._add_dictionary_entries(
+                    (f"{api_url}.{field}", api_url, 'api', None, None,
+                     str(field), info.get('type', 'Unknown'), None)
+                    for field, info in api_metadata['schema'].items()
+                )
+                self.metadata_repo.append(api_metadata)
+                self.lineage_graph.add_node(endpoint_name, node_type='api', source=api_url)
             
+            if from_cache:
+                return True, f"Successfully crawled API (cached): {api_url}"
             return True, f"Successfully crawled API: {api_url}"
             
         except Exception as e:
             return False, f"API crawl error: {str(e)}"
     
+    def crawl_apis(self, endpoints, max_workers=16):
+        """Crawl several API endpoints concurrently
+        
+        endpoints is an iterable of (api_url, headers) pairs. Requests are
+        network-bound, so they run on a bounded thread pool; results come
+        back as (success, message) tuples in input order.
+        """
+        endpoints = list(endpoints)
+        if not endpoints:
+            return []
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(endpoints))) as executor:
+            return list(executor.map(lambda endpoint: self.crawl_api(*endpoint), endpoints))
+    
+    def _crawl_csv(self, file_path):
+        """Infer schema from the first rows of a CSV file"""
+        df = pd.read_csv(file_path, nrows=5)
+        return self._infer_dataframe_schema(df)
+    
+    def _crawl_xlsx(self, file_path):
+        """Infer schema from the first rows of an .xlsx workbook"""
+        try:
+            # Not part of pandas' public API, so only .xlsx crawling relies on it
+            from pandas.io.parsers import TextParser
+        except ImportError:
+            df = pd.read_excel(file_path, nrows=5)
+            return self._infer_dataframe_schema(df)
+        
+        # Read-only mode streams the sheet XML, so only the header
+        # and first five rows are ever parsed
+        wb = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            # read_excel reads the first sheet, not the one saved as active
+            sheet = wb.worksheets[0]
+            # Stored dimensions may cover formatted but empty cells
+            sheet.reset_dimensions()
+            rows = [[_excel_value(cell) for cell in row]
+                    for row in sheet.iter_rows(max_row=6)]
+        finally:
+            wb.close()
+        # Trim empty trailing cells and rows, then pad to a common width,
+        # as pandas' openpyxl reader does
+        for row in rows:
+            while row and row[-1] == '':
+                row.pop()
+        while rows and not rows[-1]:
+            rows.pop()
+        width = max((len(row) for row in rows), default=0)
+        rows = [row + [''] * (width - len(row)) for row in rows]
+        # Same row-to-frame conversion pd.read_excel applies
+        df = (TextParser(rows, header=0, skip_blank_lines=False).read()
+              if rows else pd.DataFrame())
+        return self._infer_dataframe_schema(df)
+    
+    def _crawl_xls(self, file_path):
+        """Infer schema from the first rows of a legacy .xls workbook"""
+        df = pd.read_excel(file_path, nrows=5)
+        return self._infer_dataframe_schema(df)
+    
+    def _crawl_json(self, file_path):
+        """Infer schema from a JSON document"""
+        if ijson is not None:
+            # Stream the document so large dumps are never fully loaded
+            with open(file_path, 'rb') as f:
+                return self._infer_schema_streaming(ijson.parse(f))
+        with open(file_path, 'r') as f:
+            data = json.load(f)
+        return self._infer_schema(data)
+    
+    # Schema readers by lower-cased file extension
+    _FILE_HANDLERS = {
+        '.csv': _crawl_csv,
+        '.xlsx': _crawl_xlsx,
+        '.xls': _crawl_xls,
+        '.json': _crawl_json
+    }
+    
     def crawl_file(self, file_path):
         """Crawl a file and extract metadata"""
+        now_iso = datetime.now().isoformat(timespec="seconds")
         try:
             file_ext = os.path.splitext(file_path)[1].lower()
+            file_name = os.path.basename(file_path)
+            
+            handler = self._FILE_HANDLERS.get(file_ext)
+            if handler is None:
+                return False, f"File crawl error: unsupported file type '{file_ext}': {file_name}"
             
             file_metadata = {
                 'source_type': 'file',
                 'path': file_path,
                 'extension': file_ext,
-                'timestamp': datetime.now().isoformat(),
-                'size': os.path.getsize(file_path)
+                'timestamp': now_iso,
+                'size': os.path.getsize(file_path),
+                'schema': handler(self, file_path)
             }
             
-            if file_ext == '.csv':
-                df = pd.read_csv(file_path, nrows=5)
-                file_metadata['schema'] = self._infer_dataframe_schema(df)
-            elif file_ext in ['.xlsx', '.xls']:
-                df = pd.read_excel(file_path, nrows=5)
-                file_metadata['schema'] = self._infer_dataframe_schema(df)
-            elif file_ext == '.json':
-                with open(file_path, 'r') as f:
-                    data = json.load(f)
-                file_metadata['schema'] = self._infer_schema(data)
-            
-            self.metadata_repo.append(file_metadata)
-            
-            # Add to lineage graph
-            file_name = os.path.basename(file_path)
-            self.lineage_graph.add_node(file_name, node_type='file', source=file_path)
+            # Add to repository and lineage graph
+            with self._lock:
+                self._add_dictionary_entries(
+                    (f"{file_name}.{field}", file_path, 'file', None, None,
+                     str(field), info.get('type', 'Unknown'), None)
+                    for field, info in file_metadata['schema'].items()
+                )
+                self.metadata_repo.append(file_metadata)
+                self.lineage_graph.add_node(file_name, node_type='file', source=file_path)
             
             return True, f"Successfully crawled file: {file_name}"
             
@@ -159,25 +484,185 @@ class MetadataCrawler:
             return False, f"File crawl error: {str(e)}"
     
     def _infer_schema(self, data, parent_key=''):
-        """Infer schema from JSON data"""
+        """Infer schema from JSON data
+        
+        Walks the document depth-first with an explicit stack of iterators,
+        so deeply nested JSON cannot hit the recursion limit and every level
+        writes straight into one schema dict. Samples are rendered only up
+        to their 100-character cut-off. Objects wider than
+        max_schema_fanout keys end in a single '__truncated__' entry.
+        """
         schema = {}
-        
-        if isinstance(data, dict):
-            for key, value in data.items():
-                full_key = f"{parent_key}.{key}" if parent_key else key
+        stack = []
+        fanout = self.max_schema_fanout
+        
+        def enter(value, key):
+            if isinstance(value, dict):
+                stack.append([iter(value.items()), key, len(value), 0])
+            elif isinstance(value, list) and value:
+                # Lists are described by their first element
+                schema[key] = {
+                    'type': 'list',
+                    'sample': _sample(value[0])
+                }
+                if isinstance(value[0], dict):
+                    stack.append([iter(value[0].items()), key, len(value[0]), 0])
+        
+        enter(data, parent_key)
+        while stack:
+            frame = stack[-1]
+            items, parent, size, _ = frame
+            for key, value in items:
+                if frame[3] == fanout:
+                    # Very wide object: note how much was left out and stop
+                    truncated_key = f"{parent}.__truncated__" if parent else '__truncated__'
+                    schema[truncated_key] = {
+                        'type': 'truncated',
+                        'sample': f"+{size - fanout} more keys"
+                    }
+                    stack.pop()
+                    break
+                frame[3] += 1
+                full_key = f"{parent}.{key}" if parent else key
                 schema[full_key] = {
                     'type': type(value).__name__,
-                    'sample': str(value)[:100] if value else None
+                    'sample': _sample(value) if value else None
                 }
                 if isinstance(value, (dict, list)):
-                    schema.update(self._infer_schema(value, full_key))
-        elif isinstance(data, list) and data:
-            schema[parent_key] = {
-                'type': 'list',
-                'sample': str(data[0])[:100] if data else None
-            }
-            if isinstance(data[0], dict):
-                schema.update(self._infer_schema(data[0], parent_key))
+                    # Descend before moving on to the next sibling
+                    enter(value, full_key)
+                    break
+            else:
+                stack.pop()
+        
+        return schema
+    
+    def _infer_schema_streaming(self, events):
+        """Infer schema from an ijson event stream
+        
+        Produces the same result as _infer_schema, but holds only the current
+        path and the samples still being rendered instead of the whole
+        document. Array elements after the first are skipped once no open
+        sample needs their text.
+        """
+        schema = {}
+        stack = []
+        fanout = self.max_schema_fanout
+        active = []  # Sample buffers still short of 100 characters
+        events = iter(events)
+        
+        def emit(token):
+            nonlocal active
+            filled = False
+            for buf in active:
+                buf[0].append(token)
+                buf[1] += len(token)
+                filled = filled or buf[1] >= 100
+            if filled:
+                active = [buf for buf in active if buf[1] < 100]
+        
+        for _, event, value in events:
+            if event in ('end_map', 'end_array'):
+                frame = stack.pop()
+                emit('}' if event == 'end_map' else ']')
+                if frame['truncated']:
+                    parent = frame['path']
+                    truncated_key = f"{parent}.__truncated__" if parent else '__truncated__'
+                    schema[truncated_key] = {
+                        'type': 'truncated',
+                        'sample': f"+{frame['count'] - fanout} more keys"
+                    }
+                buf = frame['buf']
+                if buf is not None:
+                    active = [b for b in active if b is not buf]
+                    if frame['count'] or not frame['empty_none']:
+                        frame['entry']['sample'] = ''.join(buf[0])[:100]
+                continue
+            
+            parent = stack[-1] if stack else None
+            if event == 'map_key':
+                if parent['count']:
+                    emit(', ')
+                parent['count'] += 1
+                parent['key'] = value
+                if parent['record'] and fanout is not None and parent['count'] > fanout:
+                    # Very wide object: stop recording, keep counting keys
+                    parent['record'] = False
+                    parent['truncated'] = True
+                emit(repr(value) + ': ')
+                continue
+            
+            if isinstance(value, Decimal):
+                # ijson keeps non-integers exact; json.load reads them as floats
+                value = float(value)
+            is_map = event == 'start_map'
+            is_container = is_map or event == 'start_array'
+            record, path = False, None
+            entry, sampled, empty_none = None, False, False
+            
+            if parent is None:
+                record, path = is_container, ''
+            elif parent['kind'] == 'map':
+                if parent['record']:
+                    key = parent['key']
+                    full_key = f"{parent['path']}.{key}" if parent['path'] else key
+                    if is_container:
+                        entry = schema[full_key] = {
+                            'type': 'dict' if is_map else 'list',
+                            'sample': None
+                        }
+                        record, path = True, full_key
+                        sampled, empty_none = is_map, True
+                    else:
+                        entry = schema[full_key] = {
+                            'type': type(value).__name__,
+                            'sample': str(value)[:100] if value else None
+                        }
+            else:
+                if parent['count']:
+                    emit(', ')
+                parent['count'] += 1
+                if parent['record'] and parent['count'] == 1:
+                    # Lists are described by their first element
+                    entry = schema[parent['path']] = {
+                        'type': 'list',
+                        'sample': None if is_container else str(value)[:100]
+                    }
+                    record, path = is_map, parent['path']
+                    sampled = is_container
+            
+            if not is_container:
+                emit(repr(value))
+                continue
+            
+            if not (record or sampled or active):
+                # Nothing below here is recorded or sampled; fast-forward
+                depth = 1
+                for _, event, _ in events:
+                    if event in ('start_map', 'start_array'):
+                        depth += 1
+                    elif event in ('end_map', 'end_array'):
+                        depth -= 1
+                        if not depth:
+                            break
+                continue
+            
+            buf = None
+            if sampled:
+                buf = [[], 0]
+                active.append(buf)
+            stack.append({
+                'kind': 'map' if is_map else 'array',
+                'record': record,
+                'path': path,
+                'key': None,
+                'count': 0,
+                'buf': buf,
+                'entry': entry,
+                'empty_none': empty_none,
+                'truncated': False
+            })
+            emit('{' if is_map else '[')
         
         return schema
     
@@ -193,120 +678,108 @@ class MetadataCrawler:
         return schema
     
     def generate_data_dictionary(self):
-        """Generate comprehensive data dictionary from all crawled sources"""
+        """Generate comprehensive data dictionary from all crawled sources
+        
+        The result is cached until the next crawl adds entries, so callers
+        share it and should not modify it.
+        """
         full_dict = {}
         
-        for item in self.metadata_repo:
-            source_type = item['source_type']
-            
+        with self._lock:
+            version, cached = self._dictionary_cache
+            if version == self._dictionary_version:
+                return cached
+            version = self._dictionary_version
+            rows = self.db.execute(
+                """SELECT entry_key, source, source_type, table_name, column_name,
+                          field, data_type, nullable
+                   FROM dictionary ORDER BY rowid"""
+            ).fetchall()
+        
+        for key, source, source_type, table, column, field, data_type, nullable in rows:
             if source_type == 'database':
-                for table in item.get('tables', []):
-                    for col in table['columns']:
-                        key = f"{table['name']}.{col['name']}"
-                        full_dict[key] = {
-                            'source': item.get('connection', 'Unknown'),
-                            'source_type': 'database',
-                            'table': table['name'],
-                            'column': col['name'],
-                            'data_type': col['type'],
-                            'nullable': col['nullable']
-                        }
-            
-            elif source_type == 'file':
-                schema = item.get('schema', {})
-                for field, info in schema.items():
-                    key = f"{os.path.basename(item['path'])}.{field}"
-                    full_dict[key] = {
-                        'source': item['path'],
-                        'source_type': 'file',
-                        'field': field,
-                        'data_type': info.get('type', 'Unknown')
-                    }
-            
-            elif source_type == 'api':
-                schema = item.get('schema', {})
-                for field, info in schema.items():
-                    key = f"{item['url']}.{field}"
-                    full_dict[key] = {
-                        'source': item['url'],
-                        'source_type': 'api',
-                        'field': field,
-                        'data_type': info.get('type', 'Unknown')
-                    }
+                full_dict[key] = {
+                    'source': source,
+                    'source_type': 'database',
+                    'table': table,
+                    'column': column,
+                    'data_type': data_type,
+                    'nullable': None if nullable is None else bool(nullable)
+                }
+            else:
+                full_dict[key] = {
+                    'source': source,
+                    'source_type': source_type,
+                    'field': field,
+                    'data_type': data_type
+                }
         
+        with self._lock:
+            if version == self._dictionary_version:
+                self._dictionary_cache = (version, full_dict)
         return full_dict
     
     def export_to_excel(self, file_path):
         """Export metadata and data dictionary to Excel"""
         try:
-            wb = Workbook()
+            # Write-only mode streams rows to disk instead of keeping cells
+            wb = Workbook(write_only=True)
+            def header_row(ws, headers, alignment=None):
+                cells = []
+                for h in headers:
+                    cell = WriteOnlyCell(ws, value=h)
+                    cell.font = HEADER_FONT
+                    cell.fill = HEADER_FILL
+                    if alignment is not None:
+                        cell.alignment = alignment
+                    cells.append(cell)
+                return cells
             
             # Sheet 1: Data Dictionary
-            ws1 = wb.active
-            ws1.title = "Data Dictionary"
+            ws1 = wb.create_sheet("Data Dictionary")
             
             headers = ['Field', 'Source', 'Type', 'Table/File', 'Column', 'Data Type', 'Nullable']
-            ws1.append(headers)
-            
-            # Style headers
-            for cell in ws1[1]:
-                cell.font = Font(bold=True, color="FFFFFF")
-                cell.fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-                cell.alignment = Alignment(horizontal="center")
             
-            data_dict = self.generate_data_dictionary()
-            for key, value in data_dict.items():
-                row = [
-                    key,
-                    value.get('source', ''),
-                    value.get('source_type', ''),
-                    value.get('table', value.get('field', '')),
-                    value.get('column', ''),
-                    value.get('data_type', ''),
-                    str(value.get('nullable', ''))
-                ]
-                ws1.append(row)
-            
-            # Auto-adjust column widths
-            for column in ws1.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(cell.value)
-                    except:
-                        pass
-                adjusted_width = min(max_length + 2, 50)
-                ws1.column_dimensions[column_letter].width = adjusted_width
+            export_columns = ['entry_key', 'source', 'source_type', 'table_or_field',
+                              'column_name', 'data_type', 'nullable']
+            with self._lock:
+                # Auto-adjust column widths; write-only sheets need them before any row
+                lengths = self.db.execute(
+                    f"SELECT {', '.join(f'MAX(LENGTH({c}))' for c in export_columns)} "
+                    "FROM dictionary_export"
+                ).fetchone()
+                for i, (h, n) in enumerate(zip(headers, lengths), start=1):
+                    ws1.column_dimensions[get_column_letter(i)].width = min(max(len(h), n or 0) + 2, 50)
+                
+                ws1.append(header_row(ws1, headers, HEADER_ALIGNMENT))
+                # Stream rows from the dictionary table without building a dict
+                for row in self.db.execute(
+                    f"SELECT {', '.join(export_columns)} FROM dictionary_export ORDER BY seq"
+                ):
+                    ws1.append(row)
             
             # Sheet 2: Metadata Summary
             ws2 = wb.create_sheet("Metadata Summary")
-            ws2.append(['Source Type', 'Count', 'Details'])
+            ws2.append(header_row(ws2, ['Source Type', 'Count', 'Details']))
             
-            # Style headers
-            for cell in ws2[1]:
-                cell.font = Font(bold=True, color="FFFFFF")
-                cell.fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-            
-            summary = {}
-            for item in self.metadata_repo:
-                source_type = item['source_type']
-                summary[source_type] = summary.get(source_type, 0) + 1
+            with self._lock:
+                summary = Counter(item['source_type'] for item in self.metadata_repo)
             
             for source_type, count in summary.items():
                 ws2.append([source_type, count, f"{count} {source_type}(s) crawled"])
             
             # Sheet 3: Lineage Information
             ws3 = wb.create_sheet("Lineage Map")
-            ws3.append(['From', 'To', 'Relationship'])
-            
-            for cell in ws3[1]:
-                cell.font = Font(bold=True, color="FFFFFF")
-                cell.fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+            ws3.append(header_row(ws3, ['From', 'To', 'Relationship']))
             
-            for edge in self.lineage_graph.edges(data=True):
-                ws3.append([edge[0], edge[1], edge[2].get('relationship', 'related')])
+            with self._lock:
+                edgelist = nx.to_pandas_edgelist(self.lineage_graph, source='from', target='to')
+            if 'relationship' in edgelist:
+                edgelist['relationship'] = edgelist['relationship'].fillna('related')
+            else:
+                edgelist['relationship'] = 'related'
+            for row in edgelist[['from', 'to', 'relationship']].itertuples(index=False, name=None):
+                ws3.append(row)
             
             wb.save(file_path)
             return True, f"Successfully exported to {file_path}"
@@ -314,28 +787,39 @@ class MetadataCrawler:
         except Exception as e:
             return False, f"Export error: {str(e)}"
     
+    def dictionary_size(self):
+        """Number of data dictionary entries, maintained as crawls add them"""
+        return self._dictionary_size
+    
     def get_lineage_visualization_data(self):
         """Get lineage data for visualization"""
-        nodes = []
-        edges = []
-        
-        for node, data in self.lineage_graph.nodes(data=True):
-            nodes.append({
-                'id': node,
-                'type': data.get('node_type', 'unknown'),
-                'source': data.get('source', '')
-            })
-        
-        for edge in self.lineage_graph.edges(data=True):
-            edges.append({
-                'from': edge[0],
-                'to': edge[1],
-                'relationship': edge[2].get('relationship', 'related')
-            })
+        with self._lock:
+            nodes = [
+                {
+                    'id': node,
+                    'type': data.get('node_type', 'unknown'),
+                    'source': data.get('source', '')
+                }
+                for node, data in self.lineage_graph.nodes(data=True)
+            ]
+            
+            edges = [
+                {
+                    'from': u,
+                    'to': v,
+                    'relationship': data.get('relationship', 'related')
+                }
+                for u, v, data in self.lineage_graph.edges(data=True)
+            ]
         
         return nodes, edges
 
 
+def _set_text(widget, content):
+    """Replace a Text widget's contents in a single edit"""
+    widget.replace("1.0", tk.END, content)
+
+
 class MetadataCrawlerGUI:
     """Main GUI application for the Metadata Crawler"""
     
@@ -346,9 +830,41 @@ class MetadataCrawlerGUI:
         
         self.crawler = MetadataCrawler()
         self.result_queue = queue.Queue()
+        # Pending (timestamp, message) log lines, flushed when Tk is idle
+        self._log_queue = deque()
+        # Crawls dispatched whose results have not been drained yet, per
+        # crawler; a crawler replaced by Clear Data is closed once it is idle
+        self._in_flight = Counter()
+        self._draining = False
+        self._poll_id = None
+        # Consecutive empty fallback polls; stretches the poll interval
+        self._idle_polls = 0
+        # Successful crawls per source type, tallied as results are drained
+        self._source_counts = Counter()
+        # Self-pipe: workers write a byte per result and the Tcl notifier
+        # calls _on_notify when it becomes readable. Tk file handlers are
+        # POSIX-only; elsewhere workers fall back to after_idle wakeups.
+        self._notify_r = self._notify_w = None
+        if os.name == 'posix' and hasattr(self.root.tk, 'createfilehandler'):
+            self._notify_r, self._notify_w = os.pipe()
+            os.set_blocking(self._notify_r, False)
+            os.set_blocking(self._notify_w, False)
+            self.root.tk.createfilehandler(self._notify_r, tk.READABLE, self._on_notify)
         
         self._setup_ui()
         self._check_queue()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        
+    def on_close(self):
+        """Release crawler connections and close the window"""
+        if self._notify_r is not None:
+            self.root.tk.deletefilehandler(self._notify_r)
+            # The write end stays open for workers still finishing; their
+            # writes then fail quietly instead of hitting a reused fd
+            os.close(self._notify_r)
+        for crawler in {self.crawler, *self._in_flight}:
+            crawler.close()
+        self.root.destroy()
         
     def _setup_ui(self):
         """Setup the user interface"""
@@ -571,10 +1087,20 @@ class MetadataCrawlerGUI:
         
     def log(self, message):
         """Add message to activity log"""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.log_text.insert(tk.END, f"[{timestamp}] {message}\n")
+        if not self._log_queue:
+            self.root.after_idle(self._flush_log)
+        self._log_queue.append((time.strftime("%Y-%m-%d %H:%M:%S"), message))
+        
+    def _flush_log(self):
+        """Write queued log messages to the activity log in one insert"""
+        if not self._log_queue:
+            return
+        lines = []
+        while self._log_queue:
+            timestamp, message = self._log_queue.popleft()
+            lines.append(f"[{timestamp}] {message}\n")
+        self.log_text.insert(tk.END, "".join(lines))
         self.log_text.see(tk.END)
-        self.log_text.update_idletasks()
         
     def browse_sqlite(self):
         """Browse for SQLite database file"""
@@ -622,12 +1148,11 @@ class MetadataCrawlerGUI:
         db_type = self.db_type_var.get()
         self.log(f"Starting database crawl: {db_type}")
         
-        def _crawl():
-            success, message = self.crawler.crawl_database(conn_string, db_type)
-            self.result_queue.put(('database', success, message))
+        def _crawl(crawler):
+            success, message = crawler.crawl_database(conn_string, db_type)
+            return 'database', success, message
         
-        thread = threading.Thread(target=_crawl, daemon=True)
-        thread.start()
+        self._start_crawl(_crawl)
         
     def crawl_api(self):
         """Crawl API in background thread"""
@@ -648,12 +1173,11 @@ class MetadataCrawlerGUI:
         
         self.log(f"Starting API crawl: {api_url}")
         
-        def _crawl():
-            success, message = self.crawler.crawl_api(api_url, headers)
-            self.result_queue.put(('api', success, message))
+        def _crawl(crawler):
+            success, message = crawler.crawl_api(api_url, headers)
+            return 'api', success, message
         
-        thread = threading.Thread(target=_crawl, daemon=True)
-        thread.start()
+        self._start_crawl(_crawl)
         
     def crawl_files(self):
         """Crawl files in background thread"""
@@ -664,16 +1188,56 @@ class MetadataCrawlerGUI:
         
         self.log(f"Starting file crawl: {len(files)} file(s)")
         
-        def _crawl():
-            results = []
-            for file_path in files:
-                success, message = self.crawler.crawl_file(file_path)
-                results.append((success, message))
-            self.result_queue.put(('files', results))
-        
-        thread = threading.Thread(target=_crawl, daemon=True)
+        def _crawl(crawler):
+            # File reads are I/O-bound, so crawl them concurrently
+            with ThreadPoolExecutor(max_workers=min(32, len(files))) as executor:
+                results = list(executor.map(crawler.crawl_file, files))
+            return 'files', results
+        
+        self._start_crawl(_crawl)
+        
+    def _start_crawl(self, target):
+        """Run target(crawler) in a background thread and track it until drained
+        
+        The result is tagged with the crawler the crawl ran against, so
+        results from before a Clear Data can be told apart.
+        """
+        crawler = self.crawler
+        self._in_flight[crawler] += 1
+        self._idle_polls = 0
+        if self._notify_w is None and self._poll_id is None:
+            # Fallback poll while work is outstanding
+            self._poll_id = self.root.after(20, self._check_queue)
+        thread = threading.Thread(
+            target=lambda: self._post_result(crawler, target(crawler)), daemon=True
+        )
         thread.start()
         
+    def _post_result(self, crawler, result):
+        """Hand a crawl result to the GUI thread (called from workers)"""
+        self.result_queue.put((crawler, result))
+        if self._notify_w is not None:
+            try:
+                os.write(self._notify_w, b'\0')
+            except OSError:
+                # Pipe full (a wakeup is already pending) or window closed
+                pass
+            return
+        try:
+            # Tk queues this onto the event loop from any thread
+            self.root.after_idle(self._drain_queue)
+        except (tk.TclError, RuntimeError):
+            # Window already closed
+            pass
+        
+    def _on_notify(self, fd, mask):
+        """Tcl file handler: a worker posted results"""
+        try:
+            os.read(fd, 4096)
+        except BlockingIOError:
+            pass
+        self._drain_queue()
+        
     def generate_dictionary(self):
         """Generate and display data dictionary"""
         if not self.crawler.metadata_repo:
@@ -682,51 +1246,51 @@ class MetadataCrawlerGUI:
         
         self.log("Generating data dictionary...")
         
-        # Clear existing items
-        for item in self.dict_tree.get_children():
-            self.dict_tree.delete(item)
+        # Clear existing items in one call
+        self.dict_tree.delete(*self.dict_tree.get_children())
         
         # Generate dictionary
         data_dict = self.crawler.generate_data_dictionary()
         
-        # Populate tree
-        for key, value in data_dict.items():
-            self.dict_tree.insert('', tk.END, text=key, values=(
-                key,
-                value.get('source', '')[:50],
-                value.get('source_type', ''),
-                value.get('data_type', ''),
-                str(value.get('nullable', ''))
-            ))
+        # Populate tree while it is unmapped, so Tk does not redraw per row;
+        # dictionary keys are unique and double as item ids
+        self.dict_tree.grid_remove()
+        try:
+            for key, value in data_dict.items():
+                self.dict_tree.insert('', tk.END, iid=key, text=key, values=(
+                    key,
+                    value.get('source', '')[:50],
+                    value.get('source_type', ''),
+                    value.get('data_type', ''),
+                    str(value.get('nullable', ''))
+                ))
+        finally:
+            self.dict_tree.grid()
         
         self.log(f"Data dictionary generated: {len(data_dict)} entries")
         messagebox.showinfo("Success", f"Generated data dictionary with {len(data_dict)} entries")
         
     def view_lineage(self):
         """Display lineage map"""
-        if not self.crawler.lineage_graph.nodes():
+        if not self.crawler.lineage_graph.number_of_nodes():
             messagebox.showinfo("No Data", "No lineage information available")
             return
         
         self.log("Generating lineage map...")
         
-        # Clear existing text
-        self.lineage_text.delete(1.0, tk.END)
-        
         # Get lineage data
         nodes, edges = self.crawler.get_lineage_visualization_data()
         
-        # Display nodes
-        self.lineage_text.insert(tk.END, "=== DATA ENTITIES ===\n\n")
-        for node in nodes:
-            self.lineage_text.insert(tk.END, 
-                f"• {node['id']} ({node['type']})\n  Source: {node['source']}\n\n")
+        # Build the whole map first and swap it in with a single edit
+        buf = ["=== DATA ENTITIES ===\n\n"]
+        buf.extend(f"• {node['id']} ({node['type']})\n  Source: {node['source']}\n\n"
+                   for node in nodes)
         
-        # Display relationships
-        self.lineage_text.insert(tk.END, "\n=== RELATIONSHIPS ===\n\n")
-        for edge in edges:
-            self.lineage_text.insert(tk.END, 
-                f"{edge['from']} → {edge['to']} ({edge['relationship']})\n")
+        buf.append("\n=== RELATIONSHIPS ===\n\n")
+        buf.extend(f"{edge['from']} → {edge['to']} ({edge['relationship']})\n"
+                   for edge in edges)
+        
+        _set_text(self.lineage_text, "".join(buf))
         
         self.log(f"Lineage map displayed: {len(nodes)} entities, {len(edges)} relationships")
         
@@ -756,81 +1320,121 @@ class MetadataCrawlerGUI:
     def clear_data(self):
         """Clear all crawled data"""
         if messagebox.askyesno("Confirm", "Clear all crawled data?"):
+            old_crawler = self.crawler
             self.crawler = MetadataCrawler()
+            # Crawls still running keep using the old crawler; it is
+            # closed when the last of their results is drained
+            if old_crawler not in self._in_flight:
+                old_crawler.close()
+            self._source_counts.clear()
             
             # Clear UI elements
-            for item in self.dict_tree.get_children():
-                self.dict_tree.delete(item)
-            self.lineage_text.delete(1.0, tk.END)
-            self.stats_text.delete(1.0, tk.END)
+            self.dict_tree.delete(*self.dict_tree.get_children())
+            _set_text(self.lineage_text, "")
             
             self.log("All data cleared")
             self.update_statistics()
             
     def update_statistics(self):
         """Update statistics display"""
-        self.stats_text.delete(1.0, tk.END)
-        
-        self.stats_text.insert(tk.END, "=== METADATA CRAWLER STATISTICS ===\n\n")
-        
-        # Count sources
-        source_counts = {}
-        for item in self.crawler.metadata_repo:
-            source_type = item['source_type']
-            source_counts[source_type] = source_counts.get(source_type, 0) + 1
-        
-        self.stats_text.insert(tk.END, "Sources Crawled:\n")
-        for source_type, count in source_counts.items():
-            self.stats_text.insert(tk.END, f"  • {source_type.capitalize()}: {count}\n")
-        
-        # Data dictionary size
-        data_dict = self.crawler.generate_data_dictionary()
-        self.stats_text.insert(tk.END, f"\nData Dictionary Entries: {len(data_dict)}\n")
-        
-        # Lineage information
-        nodes = len(self.crawler.lineage_graph.nodes())
-        edges = len(self.crawler.lineage_graph.edges())
-        self.stats_text.insert(tk.END, f"\nLineage Entities: {nodes}\n")
-        self.stats_text.insert(tk.END, f"Lineage Relationships: {edges}\n")
-        
-    def _check_queue(self):
-        """Check for results from background threads"""
+        # Source counts are kept up to date by _drain_queue
+        lines = ["=== METADATA CRAWLER STATISTICS ===\n\n", "Sources Crawled:\n"]
+        lines.extend(f"  • {_SOURCE_LABEL.get(source_type) or source_type.capitalize()}: {count}\n"
+                     for source_type, count in self._source_counts.items())
+        
+        # Data dictionary size and lineage information
+        dict_size = self.crawler.dictionary_size()
+        nodes = self.crawler.lineage_graph.number_of_nodes()
+        edges = self.crawler.lineage_graph.number_of_edges()
+        lines.append(f"\nData Dictionary Entries: {dict_size}\n"
+                     f"\nLineage Entities: {nodes}\n"
+                     f"Lineage Relationships: {edges}\n")
+        
+        # One edit instead of a Tcl call per line
+        _set_text(self.stats_text, "".join(lines))
+        
+    def _drain_queue(self):
+        """Process every result background threads have queued so far
+        
+        Returns the number of results handled.
+        """
+        if self._draining:
+            # Re-entered from a modal dialog; the outer drain picks it up
+            return 0
+        self._draining = True
+        drained = 0
+        needs_stats = False
         try:
             while True:
-                result = self.result_queue.get_nowait()
+                crawler, result = self.result_queue.get_nowait()
+                self._in_flight[crawler] -= 1
+                if not self._in_flight[crawler]:
+                    del self._in_flight[crawler]
+                drained += 1
+                
+                if crawler is not self.crawler:
+                    # Started before Clear Data: its results were cleared too
+                    self.log("Discarded a crawl result from before the data was cleared")
+                    if crawler not in self._in_flight:
+                        crawler.close()
+                    continue
                 
                 if result[0] == 'database':
                     _, success, message = result
                     if success:
+                        self._source_counts['database'] += 1
                         self.log(f"✓ {message}")
                     else:
                         self.log(f"✗ {message}")
+                        self._flush_log()
                         messagebox.showerror("Database Error", message)
-                    self.update_statistics()
+                    needs_stats = True
                     
                 elif result[0] == 'api':
                     _, success, message = result
                     if success:
+                        self._source_counts['api'] += 1
                         self.log(f"✓ {message}")
                     else:
                         self.log(f"✗ {message}")
+                        self._flush_log()
                         messagebox.showerror("API Error", message)
-                    self.update_statistics()
+                    needs_stats = True
                     
                 elif result[0] == 'files':
                     _, results = result
                     for success, message in results:
                         if success:
+                            self._source_counts['file'] += 1
                             self.log(f"✓ {message}")
                         else:
                             self.log(f"✗ {message}")
-                    self.update_statistics()
+                    needs_stats = True
                     
         except queue.Empty:
             pass
+        finally:
+            self._draining = False
         
-        # Schedule next check
-        self.root.after(100, self._check_queue)
+        # Refresh once per burst rather than once per result
+        if needs_stats:
+            self.update_statistics()
+        self._flush_log()
+        return drained
+        
+    def _check_queue(self):
+        """Drain results, polling again only while crawls are outstanding"""
+        self._poll_id = None
+        if self._drain_queue():
+            # Results are arriving: check again soon
+            self._idle_polls = 0
+            delay = 10
+        else:
+            # Back off while nothing comes in
+            self._idle_polls = min(self._idle_polls + 1, 100)
+            delay = min(20 * self._idle_polls, 2000)
+        if self._in_flight:
+            self._poll_id = self.root.after(delay, self._check_queue)
 
 
 def main():